@@ -5,6 +5,13 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PID_FILE="sigmond_tarot.pid"
 LOG_FILE="sigmond_tarot.log"
 SIGMOND_TAROT_SCRIPT="$SCRIPT_DIR/sigmond_tarot_steps.py"
+PORT="${PORT:-3009}"
+# Seconds in-flight calls get to finish on stop/restart
+DRAIN_TIMEOUT="${TAROT_DRAIN_TIMEOUT:-${DRAIN_TIMEOUT:-30}}"
+# Seconds /ready reports 503 before the listener closes
+DRAIN_DELAY="${TAROT_DRAIN_DELAY:-0}"
+# Seconds to wait for a new process to report ready on restart
+READY_TIMEOUT="${READY_TIMEOUT:-30}"
 
 # Colors for output
 GREEN='\033[0;32m'
@@ -27,6 +34,52 @@ is_running() {
     return 1
 }
 
+# Launch a new Sigmond_Tarot process sharing the port (sets NEW_PID)
+launch_sigmond_tarot() {
+    nohup python3 "$SIGMOND_TAROT_SCRIPT" --port "$PORT" --reuse-port --drain-timeout "$DRAIN_TIMEOUT" --drain-delay "$DRAIN_DELAY" >> "$LOG_FILE" 2>&1 &
+    NEW_PID=$!
+}
+
+# Check whether anything already answers HTTP on $PORT
+port_in_use() {
+    curl -s -o /dev/null --max-time 2 "http://localhost:$PORT/"
+}
+
+# Wait until /ready is answered by the given PID
+wait_until_ready() {
+    local pid=$1
+    local attempts=$((READY_TIMEOUT * 2))
+    for ((i = 0; i < attempts; i++)); do
+        if ! ps -p "$pid" > /dev/null 2>&1; then
+            return 1
+        fi
+        # Old and new processes share the port, so retry until the new one answers
+        if curl -s "http://localhost:$PORT/ready" | grep -q "\"pid\":$pid[,}]"; then
+            return 0
+        fi
+        sleep 0.5
+    done
+    return 1
+}
+
+# Send SIGTERM and wait for in-flight calls to drain, then force kill
+drain_process() {
+    local pid=$1
+    kill -TERM "$pid" 2>/dev/null
+    
+    # Wait for the not-ready delay and drain deadline plus a little slack
+    for ((i = 0; i < DRAIN_DELAY + DRAIN_TIMEOUT + 5; i++)); do
+        if ! ps -p "$pid" > /dev/null 2>&1; then
+            return 0
+        fi
+        sleep 1
+    done
+    
+    # If still running, force kill
+    echo -e "${YELLOW}Sigmond_Tarot (PID: $pid) didn't drain in time, forcing shutdown...${NC}"
+    kill -9 "$pid" 2>/dev/null
+}
+
 # Start Sigmond_Tarot
 start_sigmond_tarot() {
     if is_running; then
@@ -34,6 +87,13 @@ start_sigmond_tarot() {
         return 1
     fi
     
+    # The port is bound with SO_REUSEPORT, so a second server would silently share it
+    if port_in_use; then
+        echo -e "${RED}Error: port $PORT is already in use by another process${NC}"
+        echo -e "   Use '$0 restart' from the directory holding $PID_FILE, or set PORT"
+        return 1
+    fi
+    
     echo -e "${GREEN}Starting Sigmond_Tarot ...${NC}"
     
     # Check if wiki.py exists
@@ -42,9 +102,10 @@ start_sigmond_tarot() {
         return 1
     fi
     
-    # Start Sigmond_Tarot in background and redirect output to log file
-    nohup python3 "$SIGMOND_TAROT_SCRIPT" --port 3009 > "$LOG_FILE" 2>&1 &
-    PID=$!
+    # Start Sigmond_Tarot in background and redirect output to a fresh log file
+    : > "$LOG_FILE"
+    launch_sigmond_tarot
+    PID=$NEW_PID
     
     # Save PID to file
     echo $PID > "$PID_FILE"
@@ -56,7 +117,7 @@ start_sigmond_tarot() {
         echo -e "${GREEN}✅ Sigmond_Tarot started successfully!${NC}"
         echo -e "   PID: $PID"
         echo -e "   Log: $LOG_FILE"
-        echo -e "   URL: http://localhost:3000/sigmond_tarot"
+        echo -e "   URL: http://localhost:$PORT/tarot"
         
         # Try to extract auth credentials from log
         if [ -f "$LOG_FILE" ]; then
@@ -80,24 +141,10 @@ stop_sigmond_tarot() {
     fi
     
     PID=$(cat "$PID_FILE")
-    echo -e "${GREEN}Stopping Sigmond_Tarot (PID: $PID)...${NC}"
+    echo -e "${GREEN}Stopping Sigmond_Tarot (PID: $PID), draining for up to $((DRAIN_DELAY + DRAIN_TIMEOUT))s...${NC}"
     
     # Send SIGTERM for graceful shutdown
-    kill -TERM "$PID" 2>/dev/null
-    
-    # Wait up to 5 seconds for process to stop
-    for i in {1..5}; do
-        if ! ps -p "$PID" > /dev/null 2>&1; then
-            break
-        fi
-        sleep 1
-    done
-    
-    # If still running, force kill
-    if ps -p "$PID" > /dev/null 2>&1; then
-        echo -e "${YELLOW}Sigmond_Tarot didn't stop gracefully, forcing shutdown...${NC}"
-        kill -9 "$PID" 2>/dev/null
-    fi
+    drain_process "$PID"
     
     # Clean up PID file
     rm -f "$PID_FILE"
@@ -105,13 +152,43 @@ stop_sigmond_tarot() {
     echo -e "${GREEN}✅ Sigmond_Tarot has been stopped${NC}"
 }
 
+# Restart next to the running process: start the new one, then drain the old one
+restart_sigmond_tarot() {
+    if ! is_running; then
+        start_sigmond_tarot
+        return
+    fi
+    
+    OLD_PID=$(cat "$PID_FILE")
+    echo -e "${GREEN}Starting new Sigmond_Tarot alongside PID $OLD_PID...${NC}"
+    launch_sigmond_tarot
+    
+    if ! wait_until_ready "$NEW_PID"; then
+        if ps -p "$NEW_PID" > /dev/null 2>&1; then
+            drain_process "$NEW_PID"
+        fi
+        # The old process may predate --reuse-port, in which case the port can't be shared
+        echo -e "${YELLOW}New process did not become ready, falling back to stop/start${NC}"
+        echo -e "   Check $LOG_FILE for errors"
+        stop_sigmond_tarot
+        sleep 1
+        start_sigmond_tarot
+        return
+    fi
+    
+    echo $NEW_PID > "$PID_FILE"
+    echo -e "${GREEN}New Sigmond_Tarot is ready (PID: $NEW_PID), draining PID $OLD_PID...${NC}"
+    drain_process "$OLD_PID"
+    echo -e "${GREEN}✅ Sigmond_Tarot restarted${NC}"
+}
+
 # Check Sigmond_Tarot's status
 status_sigmond_tarot() {
     if is_running; then
         PID=$(cat "$PID_FILE")
         echo -e "${GREEN}● Sigmond_Tarot is running${NC}"
         echo -e "   PID: $PID"
-        echo -e "   URL: http://localhost:3000/sigmond_tarot"
+        echo -e "   URL: http://localhost:$PORT/tarot"
         
         # Show process info
         ps -p "$PID" -o pid,vsz,rss,comm
@@ -145,9 +222,7 @@ case "$1" in
         stop_sigmond_tarot
         ;;
     restart)
-        stop_sigmond_tarot
-        sleep 1
-        start_sigmond_tarot
+        restart_sigmond_tarot
         ;;
     status)
         status_sigmond_tarot
@@ -162,8 +237,8 @@ case "$1" in
         echo ""
         echo "Commands:"
         echo "  start    - Start Sigmond_Tarot in the background"
-        echo "  stop     - Stop Sigmond_Tarot gracefully"
-        echo "  restart  - Restart Sigmond_Tarot"
+        echo "  stop     - Stop Sigmond_Tarot gracefully, draining in-flight calls"
+        echo "  restart  - Restart Sigmond_Tarot, draining in-flight calls on the old process"
         echo "  status   - Check if Sigmond_Tarot is running"
         echo "  logs     - Follow Sigmond_Tarot's logs"
         echo ""
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+HTTP Bench - bytes-on-wire and latency per call setup for a running Sigmond
+
+A call setup is what SignalWire does when a reading starts: fetch the SWML
+document from the agent prefix, then call draw_cards over SWAIG. Each
+setup is repeated per content encoding (identity is the uncompressed
+"before") and with fresh versus kept-alive connections.
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlparse
+
+from swaig_replay import git_label, percentile
+
+ENCODINGS = ("identity", "gzip", "br")
+
+
+class BenchClient:
+    """Minimal http.client wrapper that reports raw response sizes"""
+
+    def __init__(self, base_url, username, password, keep_alive):
+        parsed = urlparse(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.prefix = parsed.path.rstrip("/")
+        self.keep_alive = keep_alive
+        token = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self.auth_header = f"Basic {token}"
+        self.connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=30)
+
+    def post(self, path, payload, encoding):
+        """POST JSON and return (status, header bytes, body bytes, content-encoding)"""
+        if self.connection is None or not self.keep_alive:
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = self._connect()
+
+        body = json.dumps(payload).encode()
+        headers = {
+            "Authorization": self.auth_header,
+            "Content-Type": "application/json",
+            "Accept-Encoding": encoding,
+            "Connection": "keep-alive" if self.keep_alive else "close"
+        }
+        self.connection.request("POST", self.prefix + path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        raw_body = response.read()
+        header_bytes = sum(len(name) + len(value) + 4 for name, value in response.getheaders())
+        return response.status, header_bytes, len(raw_body), response.getheader("Content-Encoding", "identity")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def run_scenario(client, encoding, iterations):
+    """Run `iterations` call setups and summarise bytes and latency"""
+    swml_payload = {"call": {"call_id": "bench", "direction": "inbound"}}
+    swaig_payload = {"function": "draw_cards", "argument": {"parsed": [{}]}, "call_id": "bench"}
+
+    latencies = []
+    swml_bytes = []
+    swaig_bytes = []
+    header_bytes = []
+    served_encodings = set()
+    failures = 0
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            swml_status, swml_headers, swml_size, swml_encoding = client.post("/", swml_payload, encoding)
+            swaig_status, swaig_headers, swaig_size, swaig_encoding = client.post("/swaig", swaig_payload, encoding)
+        except (OSError, http.client.HTTPException) as e:
+            failures += 1
+            print(f"Warning: request failed ({encoding}): {e}")
+            client.close()
+            continue
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if swml_status != 200 or swaig_status != 200:
+            failures += 1
+            if failures == 1:
+                print(f"Warning: call setup returned HTTP {swml_status}/{swaig_status} ({encoding})")
+            continue
+        latencies.append(elapsed_ms)
+        swml_bytes.append(swml_size)
+        swaig_bytes.append(swaig_size)
+        header_bytes.append(swml_headers + swaig_headers)
+        served_encodings.update((swml_encoding, swaig_encoding))
+
+    client.close()
+    if not latencies:
+        return {"failures": failures}
+
+    return {
+        "setups": len(latencies),
+        "failures": failures,
+        "served_encodings": sorted(served_encodings),
+        "swml_body_bytes": round(statistics.fmean(swml_bytes)),
+        "swaig_body_bytes": round(statistics.fmean(swaig_bytes)),
+        "header_bytes": round(statistics.fmean(header_bytes)),
+        "bytes_per_setup": round(statistics.fmean(swml_bytes) + statistics.fmean(swaig_bytes) + statistics.fmean(header_bytes)),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "max": round(max(latencies), 3)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure bytes-on-wire and latency per call setup against a running Sigmond',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Example usage:
+  python3 http_bench.py http://localhost:3000/tarot -u signalwire -p secret
+  python3 http_bench.py http://localhost:3000/tarot -n 200 -o http_report.json
+        """
+    )
+    parser.add_argument('url', help='Agent URL including its prefix, e.g. http://localhost:3000/tarot')
+    parser.add_argument('--username', '-u', default=os.environ.get('SWML_DEV_USERNAME', 'signalwire'),
+                        help='Basic auth username (default: $SWML_DEV_USERNAME or signalwire)')
+    parser.add_argument('--password', '-p', default=os.environ.get('SWML_DEV_PASSWORD'),
+                        help='Basic auth password (default: $SWML_DEV_PASSWORD)')
+    parser.add_argument('--iterations', '-n', type=int, default=50, help='Call setups per scenario (default: 50)')
+    parser.add_argument('--output', '-o', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--label', default=None, help='Code version label (default: git describe)')
+
+    args = parser.parse_args()
+    if not args.password:
+        print("Error: pass --password or set SWML_DEV_PASSWORD (printed by the bot at startup)")
+        return 1
+
+    scenarios = {}
+    for keep_alive in (False, True):
+        for encoding in ENCODINGS:
+            name = f"{encoding}/{'keep-alive' if keep_alive else 'new-connection'}"
+            client = BenchClient(args.url, args.username, args.password, keep_alive)
+            scenarios[name] = run_scenario(client, encoding, args.iterations)
+            result = scenarios[name]
+            if "bytes_per_setup" in result:
+                print(f"{name:28} {result['bytes_per_setup']:>8} bytes/setup  "
+                      f"p50 {result['latency_ms']['p50']:>8.2f}ms  p95 {result['latency_ms']['p95']:>8.2f}ms  "
+                      f"served {','.join(result['served_encodings'])}")
+            else:
+                print(f"{name:28} all {result['failures']} setups failed")
+
+    report = {
+        "label": args.label or git_label(),
+        "url": args.url,
+        "iterations": args.iterations,
+        "scenarios": scenarios
+    }
+    report_json = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report_json + "\n")
+        print(f"Report written to {args.output}")
+    else:
+        print(report_json)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
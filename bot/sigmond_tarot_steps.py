@@ -9,21 +9,120 @@ import random
 import secrets
 import os
 import argparse
+import threading
+import time
 from pathlib import Path
+from types import MappingProxyType
 from signalwire_agents import AgentBase
 from signalwire_agents.core.function_result import SwaigFunctionResult
 from fastapi import Request, Response
+from speech_rules import load_speech_rules
 
 # Use cryptographically secure random for better randomness
 secure_random = secrets.SystemRandom()
 
+# Default persona, used when a tenant does not supply its own
+DEFAULT_PERSONALITY = "You are {name}, a mystical AI tarot reader from SignalWire. You have a calm, mysterious, and wise demeanor. You speak with gravitas and insight, helping seekers understand their past, present, and future through the ancient art of tarot."
+
+# Common mishearings of a reader's name, used when a tenant does not supply its own
+DEFAULT_NAME_HINTS = {"Sigmond": ["sigmund"]}
+
+# Loaded decks keyed by resolved path, shared read-only by every agent in the process
+_deck_cache = {}
+_deck_cache_lock = threading.Lock()
+
+# SWAIG functions whose request payloads are captured for offline replay.
+# get_visual_input is handled by the platform and never reaches this agent.
+RECORDED_FUNCTIONS = ("draw_cards",)
+
+# Keys in SWAIG request payloads that identify a caller or a call
+SCRUBBED_KEYS = {
+    "call_id", "ai_session_id", "conversation_id", "project_id", "space_id",
+    "caller_id_name", "caller_id_num", "caller_id_number", "from", "to",
+    "meta_data_token", "image_url", "images", "token"
+}
+
+
+def scrub_payload(data):
+    """Return a copy of a SWAIG payload with caller-identifying values replaced"""
+    if isinstance(data, dict):
+        return {
+            key: "<scrubbed>" if key in SCRUBBED_KEYS else scrub_payload(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [scrub_payload(item) for item in data]
+    return data
+
+
+def _freeze(data):
+    """Recursively convert deck JSON into read-only mappings and tuples"""
+    if isinstance(data, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze(item) for item in data)
+    return data
+
+
+def _flatten_deck(deck):
+    """Build the list of drawable cards once per deck"""
+    all_cards = []
+    
+    # Add major arcana
+    for card in deck.get("major_arcana", ()):
+        all_cards.append(MappingProxyType({"card": card, "arcana": "major"}))
+    
+    # Add minor arcana
+    for suit, cards in deck.get("minor_arcana", {}).items():
+        for card in cards:
+            all_cards.append(MappingProxyType({"card": card, "arcana": "minor", "suit": suit}))
+    
+    return tuple(all_cards)
+
+
+def load_tarot_deck(path):
+    """Load a tarot_deck.json-style file once per process
+
+    Returns a (deck, cards) pair; both are immutable and shared by every
+    agent that uses the same file.
+    """
+    key = str(Path(path).resolve())
+    with _deck_cache_lock:
+        if key not in _deck_cache:
+            with open(key, 'r') as f:
+                deck = _freeze(json.load(f))
+            _deck_cache[key] = (deck, _flatten_deck(deck))
+        return _deck_cache[key]
+
+
+class SwaigRecorder:
+    """Append scrubbed SWAIG requests to a JSON Lines file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, name, args, raw_data):
+        entry = {
+            "function": name,
+            "recorded_at": time.time(),
+            "args": scrub_payload(args or {}),
+            "raw_data": scrub_payload(raw_data or {})
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+
+
 class SigmondTarotReader(AgentBase):
     """Sigmond - Your mystical tarot reading assistant"""
     
-    def __init__(self, suppress_logs=False):
+    def __init__(self, suppress_logs=False, rng=None, name="Sigmond", route_prefix="/tarot",
+                 voice="elevenlabs.adam", personality=None, deck_path=None, name_hints=None):
         super().__init__(
-            name="Sigmond",
-            route="/",  # Internal route, will be mounted at /tarot
+            name=name,
+            route="/",  # Internal route, will be mounted at route_prefix
             host="0.0.0.0",
             port=5000,  # Default port
             suppress_logs=suppress_logs
@@ -35,13 +134,23 @@ class SigmondTarotReader(AgentBase):
             }
         })
         
-        # Load the tarot deck
-        self.tarot_deck = self._load_tarot_deck()
+        # Prefix the agent's router is mounted under (used for SWAIG URLs)
+        self.route_prefix = route_prefix
+        
+        # Load the tarot deck (shared with other agents using the same file)
+        self.tarot_deck, self.deck_cards = self._load_tarot_deck(deck_path)
         
-        # Set up Sigmond's mystical personality
+        # Random source for draws; the replay tool passes a seeded one
+        self.rng = rng or secure_random
+        
+        # Optionally capture SWAIG requests for offline replay
+        record_file = os.environ.get("TAROT_SWAIG_RECORD_FILE")
+        self.swaig_recorder = SwaigRecorder(record_file) if record_file else None
+        
+        # Set up the reader's mystical personality
         self.prompt_add_section(
             "Personality", 
-            "You are Sigmond, a mystical AI tarot reader from SignalWire. You have a calm, mysterious, and wise demeanor. You speak with gravitas and insight, helping seekers understand their past, present, and future through the ancient art of tarot."
+            (personality or DEFAULT_PERSONALITY).replace("{name}", name)
         )
         
         # Load SignalWire knowledge from markdown file
@@ -63,7 +172,7 @@ class SigmondTarotReader(AgentBase):
             .add_section("Current Task", "Call the get_visual_input tool and greet the seeker, you must incorporate the visual input into the greeting. Mention something you like about the user's appearance that will appear in the visual input.") \
             .add_bullets("Required Information", [
                 "Greet the user warmly with your signature SignalWire enthusiasm and tell them you are going to read their tech tarot cards.",
-                "Introduce yourself as Sigmond The Mystic SignalWire fortune teller bot.",
+                f"Introduce yourself as {name} The Mystic SignalWire fortune teller bot.",
                 "Get the user to imagine shuffling and cutting the cards and have them tell you when they are ready.",
                 "You cannot get the cards until you reach the card_reading step."
             ]) \
@@ -85,29 +194,9 @@ class SigmondTarotReader(AgentBase):
             .set_functions(["draw_cards"]) 
 
 
-        # Add pronunciation rules (matching JSON)
-        pronunciation_rules = [
-            {"replace": "cpaas", "with": "see pass", "ignore_case": True},
-            {"replace": "noob", "with": "nube", "ignore_case": True},            
-            {"replace": "ucaas", "with": "you kass", "ignore_case": True},
-            {"replace": "ccaas", "with": "see kass", "ignore_case": True},
-            {"replace": "iaas", "with": "Infrastructure as a service", "ignore_case": True},
-            {"replace": "PUC", "with": "puck", "ignore_case": False},
-            {"replace": "FreeSWITCH", "with": "free switch", "ignore_case": True},
-            {"replace": "Minessale", "with": "Minasauly", "ignore_case": True},
-            {"replace": "AI", "with": "A-Eye", "ignore_case": False},
-            {"replace": "SignalWire", "with": "cygnalwyre", "ignore_case": False},
-            {"replace": "SWAIG", "with": "swaygg", "ignore_case": True},
-            {"replace": "SWML", "with": "Swimmel", "ignore_case": False},
-            {"replace": "°F", "with": " degrees ", "ignore_case": False}
-        ]
-        for rule in pronunciation_rules:
-            self.add_pronunciation(rule["replace"], rule["with"], ignore_case=rule["ignore_case"])
-            
-        # Add hints (matching JSON)
-        self.add_hints(["ClueCon:2.0"])
-        self.add_pattern_hint("swimmel", "swimmel", "SWML", ignore_case=True)
-        self.add_pattern_hint("sigmund", "sigmund", "Sigmond", ignore_case=True)
+        # Add pronunciation rules and hints, compiled once from speech_rules.json
+        self.speech_rules = load_speech_rules()
+        self.speech_rules.apply(self)
         
         # Define the draw_cards function
         # Configure SWAIG functions speech fillers
@@ -117,26 +206,20 @@ class SigmondTarotReader(AgentBase):
             }
         })
         
-        # Configure Sigmond's voice - using ElevenLabs Adam
+        # Configure the reader's voice - ElevenLabs Adam by default
         self.add_language(
             name="English",
             code="en-US",
-            voice="elevenlabs.adam"  # ElevenLabs Adam voice
+            voice=voice
         )
         
-        # Add some mystical hints for better speech recognition
-        self.add_hints([
-            "tarot",
-            "reading",
-            "cards",
-            "future",
-            "past",
-            "present",
-            "Sigmond",
-            "draw cards",
-            "tell me my fortune",
-            "read my tarot"
-        ])
+        # Recognise this reader's own name; kept out of the shared rules so
+        # one tenant's name never leaks into another's speech recognition
+        self.add_hints([name])
+        if name_hints is None:
+            name_hints = DEFAULT_NAME_HINTS.get(name, [])
+        for misheard in name_hints:
+            self.add_pattern_hint(misheard, misheard, name, ignore_case=True)
         
         # Get the web root from environment variable or use local server
         web_root = os.environ.get("TAROT_WEB_ROOT")
@@ -166,31 +249,32 @@ class SigmondTarotReader(AgentBase):
         
         # Add context about the reading
         self.set_global_data({
-            "assistant_name": "Sigmond",
+            "assistant_name": name,
             "specialty": "Tarot card reading",
             "reading_style": "Three-card spread (Past, Present, Future)",
             "deck_type": "Tech-themed Tarot"
         })
     
     def _build_webhook_url(self, endpoint: str, query_params: dict = None) -> str:
-        """Override to ensure SWAIG URLs include /tarot prefix"""
+        """Override to ensure SWAIG URLs include the mount prefix (/tarot by default)"""
         # Get the base URL from parent
         url = super()._build_webhook_url(endpoint, query_params)
+        prefix = self.route_prefix
         
-        # If the URL doesn't include /tarot, add it before the endpoint
-        if '/tarot' not in url:
-            # Parse the URL to modify the path
-            from urllib.parse import urlparse, urlunparse
-            parsed = urlparse(url)
-            
-            # Find where /swaig starts in the path and insert /tarot before it
+        # Parse the URL so only its path is checked, not the credentials or host
+        from urllib.parse import urlparse, urlunparse
+        parsed = urlparse(url)
+        
+        # If the path doesn't start with the prefix, add it before the endpoint
+        if parsed.path != prefix and not parsed.path.startswith(prefix + "/"):
+            # Find where /swaig starts in the path and insert the prefix before it
             if '/swaig' in parsed.path:
-                new_path = parsed.path.replace('/swaig', '/tarot/swaig')
+                new_path = parsed.path.replace('/swaig', f'{prefix}/swaig')
             elif '/post_prompt' in parsed.path:
-                new_path = parsed.path.replace('/post_prompt', '/tarot/post_prompt')
+                new_path = parsed.path.replace('/post_prompt', f'{prefix}/post_prompt')
             else:
-                # Generic case - add /tarot at the beginning of the path
-                new_path = '/tarot' + parsed.path
+                # Generic case - add the prefix at the beginning of the path
+                new_path = prefix + parsed.path
             
             # Reconstruct the URL with the modified path
             url = urlunparse((
@@ -204,8 +288,11 @@ class SigmondTarotReader(AgentBase):
         
         return url
     
-    def _load_tarot_deck(self):
+    def _load_tarot_deck(self, deck_path=None):
         """Load the tarot deck from JSON file"""
+        if deck_path:
+            return load_tarot_deck(deck_path)
+        
         # Try to find the tarot_deck.json file
         possible_paths = [
             Path(__file__).parent.parent / "web" / "tarot_deck.json",
@@ -215,19 +302,18 @@ class SigmondTarotReader(AgentBase):
         
         for path in possible_paths:
             if path.exists():
-                with open(path, 'r') as f:
-                    return json.load(f)
+                return load_tarot_deck(path)
         
         # If no file found, return empty deck (should not happen in production)
         print("Warning: tarot_deck.json not found!")
-        return {"major_arcana": [], "minor_arcana": {}}
+        return _freeze({"major_arcana": [], "minor_arcana": {}}), ()
     
     def _prepare_card(self, card_data):
         """Prepare a single card with orientation"""
         card = card_data["card"]
         
         # Randomly determine if card is reversed (50% chance) using secure randomness
-        is_reversed = secure_random.choice([True, False])
+        is_reversed = self.rng.choice([True, False])
         
         # Build the card information
         card_info = {
@@ -264,6 +350,15 @@ class SigmondTarotReader(AgentBase):
         
         return "\n".join(lines)
 
+    def on_function_call(self, name, args, raw_data=None):
+        """Record SWAIG requests when TAROT_SWAIG_RECORD_FILE is set"""
+        if self.swaig_recorder and name in RECORDED_FUNCTIONS:
+            try:
+                self.swaig_recorder.record(name, args, raw_data)
+            except OSError as e:
+                print(f"Warning: could not record SWAIG request: {e}")
+        return super().on_function_call(name, args, raw_data)
+
     @AgentBase.tool(
         name="draw_cards",
         description="Draw three tarot cards for a past, present, and future reading",
@@ -276,20 +371,8 @@ class SigmondTarotReader(AgentBase):
     def draw_cards(self, args, raw_data):
         """Draw 3 random cards and determine their orientation, use this to do the tarot reading."""
         
-        # Get all cards from both major and minor arcana
-        all_cards = []
-        
-        # Add major arcana
-        for card in self.tarot_deck.get("major_arcana", []):
-            all_cards.append({"card": card, "arcana": "major"})
-        
-        # Add minor arcana
-        for suit, cards in self.tarot_deck.get("minor_arcana", {}).items():
-            for card in cards:
-                all_cards.append({"card": card, "arcana": "minor", "suit": suit})
-        
-        # Shuffle and draw 3 cards using secure randomness
-        drawn_cards = secure_random.sample(all_cards, 3)
+        # Shuffle and draw 3 cards from the precomputed major and minor arcana
+        drawn_cards = self.rng.sample(self.deck_cards, 3)
         
         # Prepare the reading
         reading = {
@@ -347,6 +430,7 @@ Example usage:
   python3 sigmond_tarot_steps.py                  # Run on default port 5000
   python3 sigmond_tarot_steps.py --port 8080      # Run on port 8080
   python3 sigmond_tarot_steps.py -p 5000          # Run on port 5000
+  python3 sigmond_tarot_steps.py --tenants tenants.json  # Host several readers
         """
     )
     parser.add_argument(
@@ -355,6 +439,46 @@ Example usage:
         default=int(os.environ.get('PORT', 5000)),
         help='Port to run the agent on (default: 5000 or $PORT)'
     )
+    parser.add_argument(
+        '--tenants',
+        default=os.environ.get('TAROT_TENANTS_FILE'),
+        help='JSON file describing several readers to host under different prefixes (default: $TAROT_TENANTS_FILE)'
+    )
+    parser.add_argument(
+        '--keep-alive',
+        type=int,
+        default=None,
+        help='Seconds to keep idle HTTP connections open (default: 30 or $TAROT_KEEPALIVE_TIMEOUT)'
+    )
+    parser.add_argument(
+        '--limit-concurrency',
+        type=int,
+        default=None,
+        help='Maximum concurrent connections before returning 503 (default: unlimited or $TAROT_LIMIT_CONCURRENCY)'
+    )
+    parser.add_argument(
+        '--backlog',
+        type=int,
+        default=None,
+        help='Socket listen backlog (default: 2048 or $TAROT_BACKLOG)'
+    )
+    parser.add_argument(
+        '--drain-timeout',
+        type=int,
+        default=None,
+        help='Seconds to let in-flight requests finish on shutdown (default: 30 or $TAROT_DRAIN_TIMEOUT)'
+    )
+    parser.add_argument(
+        '--drain-delay',
+        type=int,
+        default=None,
+        help='Seconds to report not-ready before closing the listener (default: 0 or $TAROT_DRAIN_DELAY)'
+    )
+    parser.add_argument(
+        '--reuse-port',
+        action='store_true',
+        help='Bind with SO_REUSEPORT so a new process can start before this one exits (or $TAROT_REUSE_PORT)'
+    )
     
     args = parser.parse_args()
     port = args.port
@@ -373,11 +497,15 @@ Example usage:
     print("  • 'I'd like a tarot reading'")
     print()
     
-    # Create and run Sigmond
-    sigmond = SigmondTarotReader()
+    # Create Sigmond, or one reader per configured tenant
+    from tarot_tenants import TenantRegistry, load_tenant_configs
     
-    # Get auth credentials for display
-    username, password = sigmond.get_basic_auth_credentials()
+    registry = TenantRegistry()
+    if args.tenants:
+        for tenant_config in load_tenant_configs(args.tenants):
+            registry.add(SigmondTarotReader(**tenant_config))
+    else:
+        registry.add(SigmondTarotReader())
     
     # Set up web directories
     web_dir = Path(__file__).parent.parent / "web"
@@ -387,7 +515,7 @@ Example usage:
     from fastapi import FastAPI
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.staticfiles import StaticFiles
-    from fastapi.responses import FileResponse, RedirectResponse
+    from fastapi.responses import FileResponse
     
     app = FastAPI(redirect_slashes=False)
     
@@ -493,33 +621,35 @@ Example usage:
                                   })
             return {"error": "og-logo not found"}
     
-    # Mount the agent's routes at /tarot (with authentication)
-    router = sigmond.as_router()
-    app.include_router(router, prefix="/tarot")
-    
-    # Add redirects for /tarot
-    @app.get("/tarot")
-    async def redirect_to_tarot_slash_get():
-        return RedirectResponse(url="/tarot/", status_code=307)
+    # Mount each reader's routes at its prefix (with authentication)
+    registry.mount(app)
     
-    @app.post("/tarot")
-    async def redirect_to_tarot_slash_post():
-        return RedirectResponse(url="/tarot/", status_code=307)
+    # Compress SWML and SWAIG responses for clients that accept it
+    from tarot_http import DrainState, add_compression, add_readiness, drain_options, run_server, uvicorn_options
+    encodings = add_compression(app, registry.agents.keys())
+    server_options = uvicorn_options(args.keep_alive, args.limit_concurrency, args.backlog)
     
-    # Store the app in the agent
-    sigmond._app = app
+    # Readiness endpoint and in-flight tracking for graceful drain
+    drain_state = DrainState()
+    add_readiness(app, drain_state)
+    shutdown_options = drain_options(args.drain_timeout, args.drain_delay, args.reuse_port)
     
     print(f"Web client available at: http://localhost:{port}/")
-    print(f"Sigmond API available at: http://localhost:{port}/tarot")
-    print(f"Basic Auth required for /tarot: {username}:{password}")
+    for prefix, agent in registry.agents.items():
+        username, password = agent.get_basic_auth_credentials()
+        print(f"{agent.name} API available at: http://localhost:{port}{prefix}")
+        print(f"Basic Auth required for {prefix}: {username}:{password}")
+    print(f"Tenant metrics available at: http://localhost:{port}/metrics/tenants")
+    print(f"Response compression: {', '.join(encodings) or 'off'}")
+    print(f"Keep-alive timeout: {server_options['timeout_keep_alive']}s")
+    print(f"Readiness check at: http://localhost:{port}/ready (drain timeout {shutdown_options['drain_timeout']}s)")
     print()
     print(f"Starting Sigmond on port {port}... Press Ctrl+C to stop.")
     print("=" * 60)
     
     try:
-        # Run the combined app with uvicorn
-        import uvicorn
-        uvicorn.run(app, host="0.0.0.0", port=port)
+        # Run the combined app with uvicorn, draining gracefully on shutdown
+        run_server(app, "0.0.0.0", port, drain_state, server_options, **shutdown_options)
     except KeyboardInterrupt:
         print("\n🔮 The spirits have departed... Until next time!")
 
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Speech Rules - pronunciation and hint tables for Sigmond
+
+Rules live in speech_rules.json and are compiled once per process into a
+deduplicated, conflict-checked table shared by every agent. Run this file
+directly for a validation and size report.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "speech_rules.json"
+
+# Compiled tables keyed by resolved path
+_compiled_cache = {}
+_compiled_cache_lock = threading.Lock()
+
+
+class SpeechRules:
+    """Compiled pronunciation rules, hints and pattern hints"""
+
+    def __init__(self, source, pronunciations, hints, pattern_hints, issues):
+        self.source = source
+        self.pronunciations = tuple(pronunciations)
+        self.hints = tuple(hints)
+        self.pattern_hints = tuple(pattern_hints)
+        self.issues = tuple(issues)
+        # The exact JSON these rules add to each SWML document
+        self.fragment = json.dumps(
+            {"pronounce": list(self.pronunciations), "hints": list(self.hints) + list(self.pattern_hints)},
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue["level"] == "error"]
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue["level"] == "warning"]
+
+    def apply(self, agent):
+        """Add every rule to an agent"""
+        for rule in self.pronunciations:
+            agent.add_pronunciation(rule["replace"], rule["with"], ignore_case=rule["ignore_case"])
+        agent.add_hints(list(self.hints))
+        for rule in self.pattern_hints:
+            agent.add_pattern_hint(rule["hint"], rule["pattern"], rule["replace"], ignore_case=rule["ignore_case"])
+
+    def report(self):
+        """Counts, problems and bytes added per SWML render"""
+        fragment_bytes = self.fragment.encode()
+        return {
+            "source": str(self.source),
+            "pronunciations": len(self.pronunciations),
+            "hints": len(self.hints),
+            "pattern_hints": len(self.pattern_hints),
+            "errors": len(self.errors),
+            "warnings": len(self.warnings),
+            "issues": list(self.issues),
+            "bytes_per_call": len(fragment_bytes),
+            "gzip_bytes_per_call": len(gzip.compress(fragment_bytes))
+        }
+
+
+def _same_term(term, ignore_case, other, other_ignore_case):
+    """Whether two rules match the same text, e.g. "AI" and a case-insensitive "ai" rule"""
+    if ignore_case or other_ignore_case:
+        return term.lower() == other.lower()
+    return term == other
+
+
+def _contains(outer, inner, ignore_case):
+    if ignore_case:
+        return inner.lower() in outer.lower()
+    return inner in outer
+
+
+def compile_speech_rules(data, source="<memory>"):
+    """Deduplicate and conflict-check raw rule data into a SpeechRules table"""
+    issues = []
+
+    def issue(level, message):
+        issues.append({"level": level, "message": message})
+
+    pronunciations = []
+    for rule in data.get("pronunciations", []):
+        if not isinstance(rule, dict):
+            issue("error", f"Pronunciation rule {rule!r} is not an object")
+            continue
+        replace = rule.get("replace", "")
+        spoken = rule.get("with", "")
+        ignore_case = bool(rule.get("ignore_case", False))
+        if not replace or not spoken:
+            issue("error", f"Pronunciation rule {rule!r} needs both 'replace' and 'with'")
+            continue
+
+        matching = [previous for previous in pronunciations
+                    if _same_term(replace, ignore_case, previous["replace"], previous["ignore_case"])]
+        conflict = next((previous for previous in matching if previous["with"] != spoken), None)
+        if conflict is not None:
+            issue("error", f"'{replace}' is pronounced both '{conflict['with']}' and '{spoken}'; keeping the first")
+            continue
+        if any(previous["ignore_case"] == ignore_case for previous in matching):
+            issue("info", f"Duplicate pronunciation for '{replace}' removed")
+            continue
+
+        pronunciations.append({"replace": replace, "with": spoken, "ignore_case": ignore_case})
+
+    # Flag terms that also match inside longer terms, e.g. "AI" in "SWAIG"
+    for rule in pronunciations:
+        for other in pronunciations:
+            if other is rule or len(other["replace"]) <= len(rule["replace"]):
+                continue
+            if _contains(other["replace"], rule["replace"], rule["ignore_case"]):
+                issue("warning", f"'{rule['replace']}' also matches inside '{other['replace']}'")
+
+    hints = []
+    for hint in data.get("hints", []):
+        if not isinstance(hint, str):
+            issue("error", f"Hint {hint!r} is not a string")
+            continue
+        if not hint:
+            continue
+        if hint in hints:
+            issue("info", f"Duplicate hint '{hint}' removed")
+            continue
+        hints.append(hint)
+
+    pattern_hints = []
+    for rule in data.get("pattern_hints", []):
+        if not isinstance(rule, dict):
+            issue("error", f"Pattern hint {rule!r} is not an object")
+            continue
+        missing = [field for field in ("hint", "pattern", "replace") if not rule.get(field)]
+        if missing:
+            issue("error", f"Pattern hint {rule!r} is missing {', '.join(missing)}")
+            continue
+        ignore_case = bool(rule.get("ignore_case", False))
+
+        matching = [previous for previous in pattern_hints
+                    if _same_term(rule["pattern"], ignore_case, previous["pattern"], previous["ignore_case"])]
+        conflict = next((previous for previous in matching if previous["replace"] != rule["replace"]), None)
+        if conflict is not None:
+            issue("error", f"Pattern '{rule['pattern']}' is replaced with both '{conflict['replace']}' "
+                           f"and '{rule['replace']}'; keeping the first")
+            continue
+        if any(previous["ignore_case"] == ignore_case for previous in matching):
+            issue("info", f"Duplicate pattern hint '{rule['pattern']}' removed")
+            continue
+
+        pattern_hints.append({
+            "hint": rule["hint"],
+            "pattern": rule["pattern"],
+            "replace": rule["replace"],
+            "ignore_case": ignore_case
+        })
+
+    return SpeechRules(source, pronunciations, hints, pattern_hints, issues)
+
+
+def load_speech_rules(path=None):
+    """Load and compile a rules file once per process
+
+    Defaults to $TAROT_SPEECH_RULES_FILE or speech_rules.json next to this
+    file. A missing file yields an empty table.
+    """
+    path = Path(path or os.environ.get("TAROT_SPEECH_RULES_FILE") or DEFAULT_RULES_PATH)
+    key = str(path.resolve())
+    with _compiled_cache_lock:
+        if key not in _compiled_cache:
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    rules = compile_speech_rules(json.load(f), source=path)
+                for problem in rules.errors:
+                    print(f"Warning: {path.name}: {problem['message']}")
+            else:
+                print(f"Warning: {path.name} not found!")
+                rules = compile_speech_rules({}, source=path)
+            _compiled_cache[key] = rules
+        return _compiled_cache[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate speech rules and report their size per call')
+    parser.add_argument('rules', nargs='?', default=None,
+                        help='Rules file (default: $TAROT_SPEECH_RULES_FILE or speech_rules.json)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--strict', action='store_true', help='Exit non-zero on warnings as well as errors')
+
+    args = parser.parse_args()
+    rules = load_speech_rules(args.rules)
+    report = rules.report()
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"Speech rules: {report['source']}")
+        print(f"  Pronunciations: {report['pronunciations']}")
+        print(f"  Hints:          {report['hints']}")
+        print(f"  Pattern hints:  {report['pattern_hints']}")
+        print(f"  Bytes per call: {report['bytes_per_call']} ({report['gzip_bytes_per_call']} gzipped)")
+        for problem in report["issues"]:
+            print(f"  [{problem['level']}] {problem['message']}")
+
+    if rules.errors or (args.strict and rules.warnings):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+SWAIG Replay - offline throughput benchmark for Sigmond
+
+Replays SWAIG requests captured with TAROT_SWAIG_RECORD_FILE in-process
+against the same bare SigmondTarotReader that main() hands to swaig-test,
+using a seeded random source, and writes a JSON report that can be diffed
+between releases.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Responses the SDK returns instead of raising when a call fails
+ERROR_RESPONSE_PREFIXES = ("Error executing function", "Data map function", "External webhook function")
+
+
+def load_recordings(path):
+    """Load recorded SWAIG requests from a JSON Lines file"""
+    recordings = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Warning: skipping line {line_number} of {path}: {e}")
+                continue
+            recordings.append(entry)
+    return recordings
+
+
+def result_shape(value):
+    """Describe the structure of a result without its (random) values
+
+    List items are merged into a single item shape, so the length of a
+    list and the order of its items do not change the shape.
+    """
+    if isinstance(value, dict):
+        return {key: result_shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        merged = None
+        for item in value:
+            shape = result_shape(item)
+            merged = shape if merged is None else merge_shapes(merged, shape)
+        return [] if merged is None else [merged]
+    return type(value).__name__
+
+
+def merge_shapes(left, right):
+    """Union of two shapes: dict keys are combined, differing types joined with |"""
+    if isinstance(left, dict) and isinstance(right, dict):
+        merged = dict(left)
+        for key, shape in right.items():
+            merged[key] = merge_shapes(merged[key], shape) if key in merged else shape
+        return dict(sorted(merged.items()))
+    if isinstance(left, list) and isinstance(right, list):
+        if not left or not right:
+            return left or right
+        return [merge_shapes(left[0], right[0])]
+    if left == right:
+        return left
+    names = set()
+    for shape in (left, right):
+        names.update(shape.split("|") if isinstance(shape, str) else [json.dumps(shape, sort_keys=True)])
+    return "|".join(sorted(names))
+
+
+def shape_digest(shape):
+    """Short stable fingerprint of a result shape"""
+    encoded = json.dumps(shape, sort_keys=True).encode()
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_label():
+    """Best-effort code version label for the report"""
+    try:
+        output = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class PerCallRandom:
+    """Random source that each worker thread reseeds before every call
+
+    The agent shares one rng attribute across threads; routing it through
+    a thread-local Random seeded from the call index makes every call draw
+    the same cards regardless of thread scheduling.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reseed(self, seed):
+        self._local.rng = random.Random(seed)
+
+    def __getattr__(self, name):
+        return getattr(self._local.rng, name)
+
+
+def build_agent(rng):
+    """Create the agent exactly as swaig-test gets it, with a replay RNG"""
+    # Never re-record the requests we are replaying
+    os.environ.pop("TAROT_SWAIG_RECORD_FILE", None)
+    from sigmond_tarot_steps import SigmondTarotReader
+    return SigmondTarotReader(suppress_logs=True, rng=rng)
+
+
+def response_error(name, result):
+    """Return the error text of a failed call's result dict, or None"""
+    if not isinstance(result, dict):
+        return None
+    response = result.get("response")
+    if not isinstance(response, str):
+        return None
+    if response == f"Function '{name}' not found" or response.startswith(ERROR_RESPONSE_PREFIXES):
+        return response
+    return None
+
+
+def call_function(agent, rng, seed, entry):
+    """Invoke one recorded SWAIG request with its own seeded RNG and time it"""
+    rng.reseed(seed)
+    start = time.perf_counter()
+    error = None
+    try:
+        result = agent.on_function_call(entry["function"], entry.get("args", {}), entry.get("raw_data", {}))
+        if hasattr(result, "to_dict"):
+            result = result.to_dict()
+        error = response_error(entry["function"], result)
+    except Exception as e:
+        result = None
+        error = f"{type(e).__name__}: {e}"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return entry["function"], elapsed_ms, result, error
+
+
+def replay(agent, rng, recordings, iterations, concurrency, seed):
+    """Replay every recording `iterations` times across a thread pool
+
+    Call number i draws from Random(seed + i), so the same seed replays the
+    same cards at any concurrency.
+    """
+    workload = [entry for _ in range(iterations) for entry in recordings]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(
+            lambda job: call_function(agent, rng, seed + job[0], job[1]),
+            enumerate(workload)
+        ))
+    wall_time = time.perf_counter() - start
+
+    functions = {}
+    for name, elapsed_ms, result, error in outcomes:
+        stats = functions.setdefault(name, {"calls": 0, "errors": 0, "latencies": [], "shape": None, "error_samples": []})
+        stats["calls"] += 1
+        stats["latencies"].append(elapsed_ms)
+        if error:
+            stats["errors"] += 1
+            if len(stats["error_samples"]) < 5:
+                stats["error_samples"].append(error)
+            continue
+        # Union across calls, so optional keys (e.g. a minor card's suit) don't split the shape
+        shape = result_shape(result)
+        stats["shape"] = shape if stats["shape"] is None else merge_shapes(stats["shape"], shape)
+
+    report_functions = {}
+    for name, stats in sorted(functions.items()):
+        latencies = stats.pop("latencies")
+        stats["shape_digest"] = shape_digest(stats["shape"])
+        stats["latency_ms"] = {
+            "mean": round(statistics.fmean(latencies), 4),
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(max(latencies), 4)
+        }
+        report_functions[name] = stats
+
+    return {
+        "total_calls": len(outcomes),
+        "wall_time_s": round(wall_time, 4),
+        "throughput_cps": round(len(outcomes) / wall_time, 2) if wall_time else 0.0,
+        "functions": report_functions
+    }
+
+
+def compare_reports(baseline, current, max_regression_pct, min_delta_ms):
+    """List shape changes and p95 latency regressions between two reports"""
+    problems = []
+    for name, base_stats in baseline.get("functions", {}).items():
+        current_stats = current.get("functions", {}).get(name)
+        if current_stats is None:
+            problems.append(f"{name}: missing from current report")
+            continue
+
+        base_digest = base_stats.get("shape_digest")
+        current_digest = current_stats.get("shape_digest")
+        if base_digest != current_digest:
+            problems.append(f"{name}: result shape changed ({base_digest} -> {current_digest})")
+
+        if current_stats.get("errors", 0) > base_stats.get("errors", 0):
+            problems.append(f"{name}: errors increased ({base_stats.get('errors', 0)} -> {current_stats['errors']})")
+
+        base_p95 = base_stats["latency_ms"]["p95"]
+        current_p95 = current_stats["latency_ms"]["p95"]
+        if base_p95 > 0:
+            change_pct = (current_p95 - base_p95) / base_p95 * 100
+            if change_pct > max_regression_pct and current_p95 - base_p95 > min_delta_ms:
+                problems.append(f"{name}: p95 latency regressed {change_pct:.1f}% ({base_p95:.3f}ms -> {current_p95:.3f}ms)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay recorded SWAIG requests against Sigmond and report latency',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Record requests from a running bot:
+  TAROT_SWAIG_RECORD_FILE=swaig_requests.jsonl python3 sigmond_tarot_steps.py
+
+Replay and compare:
+  python3 swaig_replay.py swaig_requests.jsonl -o report.json
+  python3 swaig_replay.py swaig_requests.jsonl --compare baseline.json
+        """
+    )
+    parser.add_argument('recordings', help='JSON Lines file written via TAROT_SWAIG_RECORD_FILE')
+    parser.add_argument('--seed', type=int, default=1234, help='Base seed; call i draws from seed + i (default: 1234)')
+    parser.add_argument('--concurrency', '-c', type=int, default=32, help='Worker threads (default: 32)')
+    parser.add_argument('--iterations', '-n', type=int, default=100, help='Times to replay each recording (default: 100)')
+    parser.add_argument('--output', '-o', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--label', default=None, help='Code version label (default: git describe)')
+    parser.add_argument('--compare', help='Baseline report to compare against')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='Allowed p95 latency regression in percent (default: 20)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help='Ignore p95 regressions smaller than this many ms (default: 0.5)')
+
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings)
+    if not recordings:
+        print(f"Error: no recordings found in {args.recordings}")
+        return 1
+
+    rng = PerCallRandom()
+    agent = build_agent(rng)
+    results = replay(agent, rng, recordings, args.iterations, args.concurrency, args.seed)
+
+    report = {
+        "label": args.label or git_label(),
+        "python": sys.version.split()[0],
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "recordings": len(recordings),
+        **results
+    }
+
+    report_json = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report_json + "\n")
+        print(f"Report written to {args.output}")
+    else:
+        print(report_json)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        problems = compare_reports(baseline, report, args.max_regression, args.min_delta_ms)
+        if problems:
+            print(f"Regressions against {args.compare} ({baseline.get('label', 'unknown')}):")
+            for problem in problems:
+                print(f"  - {problem}")
+            return 1
+        print(f"No regressions against {args.compare} ({baseline.get('label', 'unknown')})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+HTTP tuning for the combined Sigmond app
+
+Negotiated gzip/brotli compression for SWML and SWAIG responses, the
+uvicorn connection settings, and graceful drain for rolling
+restarts, all configurable from the environment.
+"""
+
+import os
+import socket
+import threading
+
+from starlette.middleware.gzip import GZipMiddleware
+
+# brotli is optional; without it, clients that accept gzip still get gzip
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+# Responses smaller than this are sent uncompressed
+DEFAULT_COMPRESS_MIN_SIZE = 1024
+
+# Seconds an idle keep-alive connection stays open (uvicorn's default is 5)
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+# Seconds to let in-flight requests finish after a shutdown signal
+DEFAULT_DRAIN_TIMEOUT = 30
+
+
+def _env_int(name, default=None):
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Warning: ignoring non-integer {name}={value!r}")
+        return default
+
+
+class CompressionMiddleware:
+    """Compress JSON responses under the agent prefixes only
+
+    Static media (videos, card images) is already compressed and is served
+    with range requests, so it bypasses compression entirely.
+    """
+
+    def __init__(self, app, prefixes, minimum_size=DEFAULT_COMPRESS_MIN_SIZE, mode="auto"):
+        self.app = app
+        self.prefixes = tuple(prefixes)
+        if mode == "auto" and BrotliMiddleware is not None:
+            self.compressed_app = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            self.compressed_app = GZipMiddleware(app, minimum_size=minimum_size)
+
+    def _matches(self, path):
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self._matches(scope["path"]):
+            await self.compressed_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+def add_compression(app, prefixes):
+    """Add response compression for the given prefixes, per TAROT_COMPRESSION
+
+    TAROT_COMPRESSION is "auto" (brotli when installed, else gzip), "gzip"
+    or "off"; TAROT_COMPRESS_MIN_SIZE sets the size threshold in bytes.
+    Returns the encodings offered, for display.
+    """
+    mode = os.environ.get("TAROT_COMPRESSION", "auto").lower()
+    if mode == "off":
+        return []
+    if mode not in ("auto", "gzip"):
+        print(f"Warning: unknown TAROT_COMPRESSION={mode!r}, using auto")
+        mode = "auto"
+
+    minimum_size = _env_int("TAROT_COMPRESS_MIN_SIZE", DEFAULT_COMPRESS_MIN_SIZE)
+    app.add_middleware(CompressionMiddleware, prefixes=prefixes, minimum_size=minimum_size, mode=mode)
+
+    if mode == "auto" and BrotliMiddleware is not None:
+        return ["br", "gzip"]
+    return ["gzip"]
+
+
+def uvicorn_options(keepalive_timeout=None, limit_concurrency=None, backlog=None):
+    """Keyword arguments for uvicorn.run covering keep-alive and connection limits
+
+    Explicit arguments win over TAROT_KEEPALIVE_TIMEOUT, TAROT_LIMIT_CONCURRENCY
+    and TAROT_BACKLOG; unset limits keep uvicorn's defaults.
+    """
+    options = {
+        "timeout_keep_alive": keepalive_timeout
+        if keepalive_timeout is not None
+        else _env_int("TAROT_KEEPALIVE_TIMEOUT", DEFAULT_KEEPALIVE_TIMEOUT)
+    }
+
+    limit_concurrency = limit_concurrency if limit_concurrency is not None else _env_int("TAROT_LIMIT_CONCURRENCY")
+    if limit_concurrency:
+        options["limit_concurrency"] = limit_concurrency
+
+    backlog = backlog if backlog is not None else _env_int("TAROT_BACKLOG")
+    if backlog:
+        options["backlog"] = backlog
+
+    return options
+
+
+class DrainState:
+    """Readiness flag and in-flight request count for graceful shutdown"""
+
+    def __init__(self):
+        self.draining = False
+        self.in_flight = 0
+        self.pid = os.getpid()
+
+    def snapshot(self):
+        return {
+            "status": "draining" if self.draining else "ready",
+            "pid": self.pid,
+            "in_flight": self.in_flight
+        }
+
+
+class InFlightMiddleware:
+    """Count HTTP requests that have not finished yet"""
+
+    def __init__(self, app, state):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/ready":
+            await self.app(scope, receive, send)
+            return
+        self.state.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.state.in_flight -= 1
+
+
+def add_readiness(app, state):
+    """Serve /ready, which returns 503 once the process starts draining"""
+    from fastapi.responses import JSONResponse
+
+    app.add_middleware(InFlightMiddleware, state=state)
+
+    @app.get("/ready")
+    async def readiness():
+        status_code = 503 if state.draining else 200
+        return JSONResponse(state.snapshot(), status_code=status_code)
+
+
+def bind_socket(host, port, reuse_port=False):
+    """Create the listening socket, optionally shared with a newer process
+
+    With SO_REUSEPORT the next process can bind the same port while this
+    one is still serving, so restarts never refuse connections. Linux still
+    resets connections queued on this listener but not yet accepted when
+    it closes, unless net.ipv4.tcp_migrate_req=1 (Linux 5.14+) moves them
+    to the other process.
+    """
+    # IPPROTO_TCP must be explicit: asyncio only sets TCP_NODELAY on accepted
+    # connections whose proto is IPPROTO_TCP, otherwise Nagle stalls keep-alive
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def drain_options(drain_timeout=None, drain_delay=None, reuse_port=None):
+    """Resolve drain settings from arguments or TAROT_DRAIN_TIMEOUT,
+    TAROT_DRAIN_DELAY and TAROT_REUSE_PORT"""
+    if drain_timeout is None:
+        drain_timeout = _env_int("TAROT_DRAIN_TIMEOUT", DEFAULT_DRAIN_TIMEOUT)
+    if drain_delay is None:
+        drain_delay = _env_int("TAROT_DRAIN_DELAY", 0)
+    if not reuse_port:
+        reuse_port = os.environ.get("TAROT_REUSE_PORT", "").lower() in ("1", "true", "yes")
+    return {"drain_timeout": drain_timeout, "drain_delay": drain_delay, "reuse_port": reuse_port}
+
+
+def run_server(app, host, port, state, server_options, drain_timeout=DEFAULT_DRAIN_TIMEOUT,
+               drain_delay=0, reuse_port=False):
+    """Run uvicorn with readiness flip and bounded drain on SIGTERM/SIGINT
+
+    On the first signal /ready starts returning 503. After drain_delay
+    seconds (so load balancers notice) the listener closes and in-flight
+    requests get up to drain_timeout seconds to finish. A second signal
+    skips the delay. The delay does not steer the kernel: with a shared
+    SO_REUSEPORT port new connections keep landing on this listener until
+    it closes (see bind_socket).
+    """
+    import uvicorn
+
+    class DrainingServer(uvicorn.Server):
+        def handle_exit(self, sig, frame):
+            if not state.draining:
+                state.draining = True
+                print(f"Draining: {state.in_flight} request(s) in flight, "
+                      f"waiting up to {drain_timeout}s for them to finish")
+                if drain_delay > 0:
+                    timer = threading.Timer(drain_delay, super().handle_exit, args=(sig, frame))
+                    timer.daemon = True
+                    timer.start()
+                    return
+            super().handle_exit(sig, frame)
+
+    config = uvicorn.Config(app, host=host, port=port, timeout_graceful_shutdown=drain_timeout, **server_options)
+    server = DrainingServer(config)
+    sock = bind_socket(host, port, reuse_port)
+    try:
+        server.run(sockets=[sock])
+    finally:
+        sock.close()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tenant registry for hosting several tarot readers in one process
+
+Each tenant is a SigmondTarotReader with its own name, voice, persona,
+deck and URL prefix. Tenants are mounted on a single FastAPI app and get
+their own request metrics; decks are loaded once and shared read-only.
+"""
+
+import json
+import time
+from pathlib import Path
+
+# Paths served by the combined app itself, which a tenant may not claim
+RESERVED_PREFIXES = ("/card_images", "/metrics", "/ready")
+
+
+def load_tenant_configs(path):
+    """Read a tenants JSON file into SigmondTarotReader keyword arguments
+
+    The file holds {"tenants": [{"prefix": "/tarot", "name": "Sigmond",
+    "voice": "elevenlabs.adam", "deck": "../web/tarot_deck.json",
+    "personality": "...", "name_hints": ["sigmund"]}]}. Deck paths are
+    relative to the file; name_hints are mishearings mapped to the name.
+    """
+    config_path = Path(path)
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    tenants = config.get("tenants", [])
+    if not tenants:
+        raise ValueError(f"{config_path} does not define any tenants")
+
+    configs = []
+    seen_prefixes = set()
+    for index, tenant in enumerate(tenants):
+        prefix = "/" + tenant.get("prefix", "").strip("/")
+        if prefix == "/":
+            raise ValueError(f"Tenant #{index} in {config_path} needs a non-root prefix")
+        if prefix in seen_prefixes:
+            raise ValueError(f"Tenant prefix {prefix} is used more than once in {config_path}")
+        if any(prefix == reserved or prefix.startswith(reserved + "/") for reserved in RESERVED_PREFIXES):
+            raise ValueError(f"Tenant prefix {prefix} clashes with a built-in route")
+        seen_prefixes.add(prefix)
+
+        kwargs = {"route_prefix": prefix}
+        if tenant.get("name"):
+            kwargs["name"] = tenant["name"]
+        if tenant.get("voice"):
+            kwargs["voice"] = tenant["voice"]
+        if tenant.get("personality"):
+            kwargs["personality"] = tenant["personality"]
+        if "name_hints" in tenant:
+            kwargs["name_hints"] = list(tenant["name_hints"])
+        if tenant.get("deck"):
+            deck_path = Path(tenant["deck"])
+            if not deck_path.is_absolute():
+                deck_path = config_path.parent / deck_path
+            kwargs["deck_path"] = str(deck_path)
+        configs.append(kwargs)
+
+    return configs
+
+
+class TenantMetrics:
+    """Request counters for one tenant"""
+
+    def __init__(self, name, prefix):
+        self.name = name
+        self.prefix = prefix
+        self.requests = 0
+        self.swml_requests = 0
+        self.swaig_requests = 0
+        self.post_prompt_requests = 0
+        self.errors = 0
+        self.redirects = 0
+        self.in_flight = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, path, status_code, elapsed_ms):
+        # The bare-prefix redirect is followed by the real request, so
+        # counting it would double SWML fetches and dilute the latency
+        if 300 <= status_code < 400:
+            self.redirects += 1
+            return
+        self.requests += 1
+        endpoint = path[len(self.prefix):].strip("/")
+        if endpoint.startswith("swaig"):
+            self.swaig_requests += 1
+        elif endpoint.startswith("post_prompt"):
+            self.post_prompt_requests += 1
+        elif path == self.prefix + "/":
+            self.swml_requests += 1
+        if status_code >= 500:
+            self.errors += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def snapshot(self):
+        return {
+            "name": self.name,
+            "prefix": self.prefix,
+            "requests": self.requests,
+            "swml_requests": self.swml_requests,
+            "swaig_requests": self.swaig_requests,
+            "post_prompt_requests": self.post_prompt_requests,
+            "errors": self.errors,
+            "redirects": self.redirects,
+            "in_flight": self.in_flight,
+            "mean_ms": round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 3)
+        }
+
+
+class TenantRegistry:
+    """Mounts many agents on one FastAPI app under different prefixes"""
+
+    def __init__(self):
+        self._agents = {}
+        self._metrics = {}
+
+    def add(self, agent):
+        """Register an agent under its route_prefix"""
+        prefix = agent.route_prefix
+        if prefix in self._agents:
+            raise ValueError(f"A tenant is already mounted at {prefix}")
+        self._agents[prefix] = agent
+        self._metrics[prefix] = TenantMetrics(agent.name, prefix)
+        return agent
+
+    @property
+    def agents(self):
+        return dict(self._agents)
+
+    def tenant_for_path(self, path):
+        """Return the prefix owning a request path, or None"""
+        for prefix in sorted(self._agents, key=len, reverse=True):
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+    def metrics(self):
+        return {prefix: metrics.snapshot() for prefix, metrics in self._metrics.items()}
+
+    def mount(self, app):
+        """Include every tenant's router, redirects and metrics on the app"""
+        from fastapi.responses import RedirectResponse
+
+        for prefix, agent in self._agents.items():
+            # Mount the agent's routes (with authentication)
+            app.include_router(agent.as_router(), prefix=prefix)
+
+            # Redirect the bare prefix to the router root
+            def make_redirect(target):
+                async def redirect_to_tenant_slash():
+                    return RedirectResponse(url=target, status_code=307)
+                return redirect_to_tenant_slash
+
+            app.add_api_route(prefix, make_redirect(prefix + "/"), methods=["GET", "POST"],
+                              include_in_schema=False)
+
+            # Store the app in the agent
+            agent._app = app
+
+        @app.middleware("http")
+        async def track_tenant_requests(request, call_next):
+            prefix = self.tenant_for_path(request.url.path)
+            if prefix is None:
+                return await call_next(request)
+
+            metrics = self._metrics[prefix]
+            metrics.in_flight += 1
+            start = time.perf_counter()
+            status_code = 500
+            try:
+                response = await call_next(request)
+                status_code = response.status_code
+                return response
+            finally:
+                metrics.in_flight -= 1
+                metrics.record(request.url.path, status_code, (time.perf_counter() - start) * 1000)
+
+        @app.get("/metrics/tenants")
+        async def tenant_metrics():
+            return {"tenants": self.metrics()}